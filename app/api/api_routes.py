@@ -4,6 +4,7 @@ Visualization module for the VM execution and Git repository management.
 
 import json
 import logging
+import re
 from datetime import datetime, timedelta
 from queue import Queue, Empty
 from threading import Thread
@@ -33,6 +34,7 @@ from app.core.task.manager import TaskService
 from app.core.task.utils import parse_goal_response_format
 from app.core.labels.classifier import get_label_path
 from app.core.plan.generator import PlanUnavailableError
+from app.utils import json_dumps
 
 api_blueprint = Blueprint("api", __name__, url_prefix="/api")
 
@@ -58,7 +60,74 @@ def log_and_return_error(message, error_type, status_code):
         current_app.logger.error("%s", message)
     else:
         current_app.logger.info("%s", message)
-    return jsonify({"error": message}), status_code
+    return json_response({"error": message}, status_code)
+
+
+def json_response(data, status_code=200):
+    """Build a JSON response with the fast json_dumps encoder.
+
+    Used for payloads carrying whole VM states, diffs and branch listings,
+    where Flask's stdlib-based jsonify dominates the request time. Payloads
+    holding datetimes stay on jsonify, which renders them differently.
+    """
+    return Response(json_dumps(data), status=status_code, mimetype="application/json")
+
+
+# Full commit ids (40-hex git shas, 32-hex MySQL ids) name immutable commits;
+# anything else (abbreviations, refs) may resolve differently later.
+_COMMIT_ID_RE = re.compile(r"[0-9a-f]{32}|[0-9a-f]{40}")
+
+
+def with_etag(response, etag):
+    """Attach etag to response when one is known."""
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def commit_etag(commit_hash, kind):
+    """ETag for a response derived only from commit_hash, if it is immutable."""
+    if _COMMIT_ID_RE.fullmatch(commit_hash):
+        return f"{kind}:{commit_hash}"
+    return None
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds etag, else None."""
+    if etag and request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def stream_json_entries(first, entries, ndjson=False):
+    """Stream entries as a JSON array, or as NDJSON when ndjson is set.
+
+    first is the already-fetched head of entries (None if it was empty).
+    """
+
+    def generate():
+        try:
+            if ndjson:
+                if first is not None:
+                    yield json_dumps(first) + b"\n"
+                for entry in entries:
+                    yield json_dumps(entry) + b"\n"
+                return
+
+            if first is None:
+                yield b"[]"
+                return
+            yield b"[" + json_dumps(first)
+            for entry in entries:
+                yield b"," + json_dumps(entry)
+            yield b"]"
+        finally:
+            entries.close()
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(generate(), mimetype=mimetype)
 
 
 # Define a new blueprint for non-API routes
@@ -77,8 +146,56 @@ def get_execution_details(task_id, branch):
         if not task:
             return jsonify([]), 200
 
+        stream = request.args.get("stream")
+        limit = request.args.get("limit")
+        cursor = request.args.get("cursor")
+
+        if limit is not None:
+            try:
+                limit = int(limit)
+                if limit <= 0:
+                    raise ValueError
+            except ValueError:
+                return log_and_return_error(
+                    f"Invalid limit {limit} for task {task_id}", "warning", 400
+                )
+        # Cursors are the full commit ids handed out as next_cursor.
+        if cursor is not None and not _COMMIT_ID_RE.fullmatch(cursor):
+            return log_and_return_error(
+                f"Invalid cursor {cursor} for task {task_id}", "warning", 400
+            )
+
+        # The listing is a pure function of the branch tip (and the response
+        # shape), so an unchanged branch can be answered with 304. The ETag
+        # is built from the validated parameters only, never raw query text.
+        if limit is not None:
+            mode = "page"
+        elif stream:
+            mode = "ndjson" if stream == "ndjson" else "stream"
+        else:
+            mode = "list"
+        etag = None
         try:
-            vm_states = task.get_execution_details(branch)
+            tip = task.get_branch_head(branch)
+        except Exception as e:
+            current_app.logger.warning("Failed to resolve branch %s: %s", branch, e)
+            tip = None
+        if tip:
+            etag = f"{tip}:{mode}:{limit or ''}:{cursor or ''}"
+            response = not_modified(etag)
+            if response is not None:
+                return response
+
+        try:
+            if limit is not None:
+                page = task.get_execution_details_page(branch, limit, cursor)
+                return with_etag(json_response(page), etag)
+            if stream:
+                entries = task.iter_execution_details(branch)
+                # Pull the first entry here so branch errors still map to a 500.
+                first = next(entries, None)
+            else:
+                vm_states = task.get_execution_details(branch)
         except Exception as e:
             return log_and_return_error(
                 f"Unexpected error fetching VM state for branch {branch} for task {task_id}: {str(e)}",
@@ -86,7 +203,10 @@ def get_execution_details(task_id, branch):
                 500,
             )
 
-        return jsonify(vm_states)
+        if stream:
+            response = stream_json_entries(first, entries, ndjson=(stream == "ndjson"))
+            return with_etag(response, etag)
+        return with_etag(json_response(vm_states), etag)
 
 
 @api_blueprint.route("/tasks/<task_id>/commits/<commit_hash>/detail")
@@ -98,6 +218,11 @@ def get_execution_detail(task_id, commit_hash):
                 f"Task with ID {task_id} not found.", "error", 404
             )
 
+        etag = commit_etag(commit_hash, "detail")
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
         try:
             vm_states = task.get_execution_details(commit_hash=commit_hash)
             if vm_states is None or len(vm_states) != 1:
@@ -106,7 +231,7 @@ def get_execution_detail(task_id, commit_hash):
                     "warning",
                     404,
                 )
-            return jsonify(vm_states[0])
+            return with_etag(json_response(vm_states[0]), etag)
         except Exception as e:
             return log_and_return_error(
                 f"Unexpected error fetching VM state for commit {commit_hash} for task {task_id}: {str(e)}",
@@ -165,9 +290,20 @@ def code_diff(task_id, commit_hash):
                 f"Task with ID {task_id} not found.", "error", 404
             )
 
+        # ?raw=1 returns the patch as text/x-diff, skipping the JSON envelope
+        # and the escaping of every line of a possibly large diff. The patch
+        # is still built in memory before it is sent.
+        raw = request.args.get("raw", "").lower() in ("1", "true", "yes")
+        etag = commit_etag(commit_hash, "diff-raw" if raw else "diff")
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
         try:
             diff = task.get_state_diff(commit_hash)
-            return jsonify({"diff": diff})
+            if raw:
+                return with_etag(Response(diff, mimetype="text/x-diff"), etag)
+            return with_etag(json_response({"diff": diff}), etag)
         except Exception as e:
             return log_and_return_error(
                 f"Error generating diff for commit {commit_hash} for task '{task_id}': {str(e)}",
@@ -557,7 +693,7 @@ def get_branches(task_id):
                 )
 
             branch_data = task.get_branches()
-            return jsonify(branch_data)
+            return json_response(branch_data)
         except GitCommandError as e:
             return log_and_return_error(
                 f"Error fetching branches for task '{task_id}': {str(e)}",
@@ -726,6 +862,7 @@ def stream_execute_vm():
                 current_app.logger.error(error_message, exc_info=True)
                 yield protocol.send_error(error_message)
 
+        vm = None
         try:
             current_app.logger.info(f"Starting VM execution with goal: {clean_goal}")
             # Generate Plan
@@ -872,6 +1009,7 @@ def stream_execute_vm():
                                         chunk += ". "
                                     yield protocol.send_text_part(chunk)
 
+                    vm.flush_commits()
                     task.mark_as_completed()
                     break
 
@@ -896,6 +1034,19 @@ def stream_execute_vm():
             task.task_orm.status = TaskStatus.failed
             task.task_orm.logs = f"Error during VM execution: {error_message}"
             task.save()
+        finally:
+            # Record any steps still buffered by commit batching, including
+            # when the client disconnects mid-stream.
+            if vm is not None:
+                try:
+                    vm.flush_commits()
+                except Exception as e:
+                    current_app.logger.error(
+                        "Failed to commit buffered steps (%s): %s",
+                        task_id,
+                        e,
+                        exc_info=True,
+                    )
 
     return Response(
         stream_with_context(event_stream()),
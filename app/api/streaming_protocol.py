@@ -1,8 +1,9 @@
-import json
 from dataclasses import dataclass
 from enum import Enum
 from typing import Union, Optional, List
 
+from app.utils import json_dumps
+
 
 # Chat stream response event types
 class EventType(str, Enum):
@@ -22,8 +23,9 @@ class ExecutionEvent:
     payload: str | dict | list | None = None
 
     def encode(self, charset: str = "utf-8") -> bytes:
-        body = self.payload
-        body = json.dumps(body, separators=(",", ":"))
+        # json_dumps goes through orjson when it is installed, which is
+        # compact like separators=(",", ":") and leaves non-ASCII unescaped.
+        body = json_dumps(self.payload).decode("utf-8")
         return f"{self.event_type.value}:{body}\n".encode(charset)
 
 
@@ -56,6 +56,31 @@ DATABASE_URI = os.environ.get("DATABASE_URI") or os.environ.get(
 )
 SESSION_POOL_SIZE: int = os.environ.get("SESSION_POOL_SIZE", 40)
 
+# Exact-match LLM response cache entries per LLMInterface (0 disables caching)
+LLM_RESPONSE_CACHE_SIZE: int = int(os.environ.get("LLM_RESPONSE_CACHE_SIZE", 0))
+
+# Number of successful VM steps recorded per branch commit
+# (1 = commit every step, 0 = one commit when the plan finishes)
+VM_COMMIT_BATCH_SIZE: int = int(os.environ.get("VM_COMMIT_BATCH_SIZE", 1))
+
+# Memory budget in bytes for raw vm_state.json blobs cached by the git branch
+# manager (per process)
+VM_STATE_CACHE_BYTES: int = int(
+    os.environ.get("VM_STATE_CACHE_BYTES", 32 * 1024 * 1024)
+)
+
+# Memory budget in bytes for commit patches cached by the git branch manager
+# (per process)
+GIT_DIFF_CACHE_BYTES: int = int(
+    os.environ.get("GIT_DIFF_CACHE_BYTES", 16 * 1024 * 1024)
+)
+
+# Memory budget in bytes for commit listings (hashes, dates and messages)
+# cached by the git branch manager (per process)
+GIT_COMMIT_ROWS_CACHE_BYTES: int = int(
+    os.environ.get("GIT_COMMIT_ROWS_CACHE_BYTES", 16 * 1024 * 1024)
+)
+
 # Get project root directory
 PROJECT_ROOT = os.path.dirname(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
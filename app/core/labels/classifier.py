@@ -1,4 +1,3 @@
-import json
 import logging
 import copy
 from typing import List, Dict, Tuple, Optional, Any
@@ -341,10 +340,13 @@ class LabelClassifier:
 
         try:
             label_path = extract_json(response)
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # Let a retry reach the LLM instead of replaying this response.
+            self.llm_interface.discard_cached_response(prompt)
             raise ValueError(f"Failed to parse label path JSON: {e}. Data {response}")
 
         if not label_path or not isinstance(label_path, list):
+            self.llm_interface.discard_cached_response(prompt)
             raise ValueError(f"Invalid label path format. {label_path}")
 
         if len(label_path) > 0 and isinstance(label_path[-1], str):
@@ -394,7 +396,8 @@ class LabelClassifier:
         # Parse the LLM response to extract label path
         try:
             label_path = extract_json(response)
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            self.llm_interface.discard_cached_response(prompt)
             raise ValueError(f"Failed to parse label path JSON: {e}")
 
         return label_path
@@ -95,11 +95,15 @@ Below are the inputs for your evaluation:
 Now Let's think step by step! Do you best on this evaluation task!
 """
 
+    response = None
     try:
         response = llm_client.generate(evaluation_prompt)
         return extract_json(response)
     except Exception as e:
         logger.error(f"Error evaluating task answer: {e}", exc_info=True)
+        if response is not None:
+            # Let a retry reach the LLM instead of replaying this response.
+            llm_client.discard_cached_response(evaluation_prompt)
         return None
 
 
@@ -159,6 +163,7 @@ Format your response as JSON:
 }}
 ```"""
 
+    response = None
     try:
         # Get reflection from LLM
         response = llm_client.generate(prompt)
@@ -166,6 +171,8 @@ Format your response as JSON:
         return reflection
     except Exception as e:
         logger.error("Error during reflection: %s, %s", e, response, exc_info=True)
+        if response is not None:
+            llm_client.discard_cached_response(prompt)
         return {
             "should_optimize": False,
             "suggestion": f"Error during reflection: {str(e)}, {response}",
@@ -213,6 +220,7 @@ Return JSON array with scores in this format:
   {{"commit_hash": "hash2", "score": score2}}
 ]"""
 
+    response = None
     try:
         response = llm_client.generate(evaluation_prompt)
         scores = extract_json(response)
@@ -233,6 +241,8 @@ Return JSON array with scores in this format:
         )
     except Exception as e:
         logger.error(f"Error evaluating multiple answers: {e}", exc_info=True)
+        if response is not None:
+            llm_client.discard_cached_response(evaluation_prompt)
         return []
 
 
@@ -276,9 +286,12 @@ Below are the execution context details:
 Analyze the error systematically and provide actionable recovery guidance:
 """
 
+    response = None
     try:
         response = llm_client.generate(error_eval_prompt)
         return extract_json(response)
     except Exception as e:
         logger.error(f"Error evaluating execution error: {e}", exc_info=True)
+        if response is not None:
+            llm_client.discard_cached_response(error_eval_prompt)
         return None
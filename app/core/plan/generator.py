@@ -54,4 +54,6 @@ def generate_plan(
     logger.error(
         f"Failed to parse the generated plan: {plan_response} for goal: {goal}"
     )
+    # Let a retry reach the LLM instead of replaying the unparseable response.
+    llm_interface.discard_cached_response(prompt)
     raise PlanUnavailableError(plan_response)
@@ -36,7 +36,7 @@ def optimize_whole_plan(
     )
 
     try:
-        plan_response = llm_client.generate(updated_prompt)
+        plan_response = llm_client.generate(updated_prompt, nocache=True)
         plan_data = parse_plan(plan_response)
         if plan_data:
             return plan_data
@@ -70,7 +70,7 @@ def optimize_partial_plan(
 
     plan_response = None
     try:
-        plan_response = llm_interface.generate(prompt)
+        plan_response = llm_interface.generate(prompt, nocache=True)
         if not plan_response:
             logger.error("LLM failed to update the plan: %s", plan_response)
             raise ValueError("LLM failed to update the plan. Please try again later.")
@@ -3,10 +3,14 @@ import logging
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
-from app.utils import find_first_json_object, extract_json
+from app.utils import parse_first_json_object, extract_json
 
 logger = logging.getLogger(__name__)
 
+_THINK_RE = re.compile(r"<think>(.*?)</think>", re.DOTALL)
+_ANSWER_RE = re.compile(r"<answer>(.*?)</answer>", re.DOTALL)
+_JSON_OBJECT_FENCE_RE = re.compile(r"```json\s*({.*?})\s*```", re.DOTALL)
+
 
 def extract_reasoning_and_plan(
     plan_response: str,
@@ -29,13 +33,13 @@ def extract_reasoning_and_plan(
     """
     try:
         # Extract reasoning
-        think_match = re.search(r"<think>(.*?)</think>", plan_response, re.DOTALL)
+        think_match = _THINK_RE.search(plan_response)
         reasoning_content = None
         if think_match:
             reasoning_content = think_match.group(1).strip()
 
         # Extract plan
-        answer_match = re.search(r"<answer>(.*?)</answer>", plan_response, re.DOTALL)
+        answer_match = _ANSWER_RE.search(plan_response)
         if not answer_match:
             # If no answer is found, return the reasoning content and the original response
             return reasoning_content, plan_response
@@ -70,18 +74,15 @@ def parse_plan(response: str) -> Dict:
 def parse_step(step_response: str) -> Optional[Dict[str, Any]]:
     """Parse the step response to extract a single step."""
     try:
-        json_code_block_pattern = re.compile(r"```json\s*({.*?})\s*```", re.DOTALL)
-        match = json_code_block_pattern.search(step_response)
+        match = _JSON_OBJECT_FENCE_RE.search(step_response)
         if match:
-            json_str = match.group(1)
+            step = json.loads(match.group(1))
         else:
-            json_str = find_first_json_object(step_response)
+            step = parse_first_json_object(step_response)
 
-        if not json_str:
+        if step is None:
             raise ValueError("No valid JSON array found in the response.")
 
-        step = json.loads(json_str)
-
         if not isinstance(step, dict):
             raise ValueError("Parsed step is not a dictionary.")
 
@@ -25,6 +25,7 @@ from app.config.database import SessionLocal
 from app.instructions import global_tools_hub
 from app.config.settings import VM_SPEC_CONTENT
 from app.storage.branch_manager import CommitType
+from app.storage.branch_manager.commit import parse_commit_steps
 from app.core.plan.generator import generate_plan
 from app.core.plan.optimizer import optimize_partial_plan
 from app.core.labels.classifier import LabelClassifier
@@ -98,6 +99,17 @@ class Task:
 
         return self.branch_manager.get_commits(branch_name)
 
+    def get_execution_details_page(
+        self, branch_name: str, limit: int, cursor: Optional[str] = None
+    ):
+        return self.branch_manager.get_commits_page(branch_name, limit, cursor)
+
+    def iter_execution_details(self, branch_name: str):
+        return self.branch_manager.iter_commits(branch_name)
+
+    def get_branch_head(self, branch_name: str) -> Optional[str]:
+        return self.branch_manager.get_branch_head(branch_name)
+
     def get_answer_detail(self, branch_name: Optional[str] = "main"):
         return self.branch_manager.get_latest_commit(branch_name)
 
@@ -200,16 +212,26 @@ class Task:
 
     def _run(self, vm: PlanExecutionVM):
         """Execute the plan for the task."""
-        while True:
-            execution_result = vm.step()
-            if execution_result.get("success") is not True:
-                raise ValueError(
-                    f"Failed to execute step:{execution_result.get('error')}"
-                )
+        try:
+            while True:
+                execution_result = vm.step()
+                if execution_result.get("success") is not True:
+                    raise ValueError(
+                        f"Failed to execute step:{execution_result.get('error')}"
+                    )
 
-            if vm.state.get("goal_completed"):
-                logger.info("Goal completed during plan execution.")
-                break
+                if vm.state.get("goal_completed"):
+                    logger.info("Goal completed during plan execution.")
+                    break
+        except BaseException:
+            # Record any steps still buffered by commit batching without
+            # masking the original error.
+            try:
+                vm.flush_commits()
+            except Exception as e:
+                logger.error("Failed to commit buffered steps: %s", e, exc_info=True)
+            raise
+        vm.flush_commits()
 
         if vm.state.get("goal_completed"):
             self.mark_as_completed()
@@ -371,6 +393,7 @@ class Task:
         )
         logger.info("Generated updated plan: %s", json.dumps(updated_plan, indent=2))
 
+        # set_plan commits the steps executed under the old plan first.
         vm.set_plan(updated_plan.get("reasoning"), updated_plan.get("plan"))
         vm.recalculate_variable_refs()
         vm.save_state()
@@ -499,17 +522,22 @@ class Task:
 
                 updated_step = parse_step(updated_step_response)
                 if not updated_step:
+                    self.reasoning_llm.discard_cached_response(prompt)
                     raise ValueError(
                         f"Failed to parse updated step {updated_step_response}"
                     )
 
                 logger.info(
-                    f"Updating step: {updated_step}, program_counter: {vm.state['program_counter']}"
+                    "Updating step: %s, program_counter: %s",
+                    updated_step,
+                    vm.state["program_counter"],
                 )
 
                 previous_commit_hash = self.branch_manager.get_parent_commit_hash(
                     commit_hash
                 )
+                commit = self.branch_manager.get_commit(commit_hash)
+                batched_steps = parse_commit_steps(commit["message"]) if commit else []
 
                 branch_name = (
                     f"optimize_step_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -522,7 +550,15 @@ class Task:
                         self.task_orm.goal, self.branch_manager, self.llm
                     )
                     vm.state["current_plan"][seq_no] = updated_step
-                    vm.state["program_counter"] = seq_no
+                    if batched_steps:
+                        # The parent state predates every step of the batch,
+                        # so resume where the batch started (or earlier) and
+                        # run its steps before seq_no again.
+                        vm.state["program_counter"] = min(
+                            seq_no, vm.state["program_counter"]
+                        )
+                    else:
+                        vm.state["program_counter"] = seq_no
                     vm.recalculate_variable_refs()
                     vm.save_state()
 
@@ -538,7 +574,9 @@ class Task:
 
                     if new_commit_hash:
                         logger.info(
-                            f"Resumed execution with updated plan on branch '{branch_name}'. New commit: {new_commit_hash}"
+                            "Resumed execution with updated plan on branch '%s'. New commit: %s",
+                            branch_name,
+                            new_commit_hash,
                         )
                     else:
                         raise ValueError("Failed to commit step optimization")
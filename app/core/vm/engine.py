@@ -5,6 +5,7 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional, List
 
+from app.config.settings import VM_COMMIT_BATCH_SIZE
 from app.instructions import InstructionHandlers
 from app.storage.branch_manager import CommitType
 from app.core.vm.step import Step, StepStatus
@@ -27,6 +28,7 @@ class PlanExecutionVM:
         branch_manager: BranchManager,
         llm_interface: LLMInterface,
         max_workers=3,
+        commit_batch_size: int = VM_COMMIT_BATCH_SIZE,
     ):
         self.variable_manager = VariableManager()
         self.state: Dict[str, Any] = {
@@ -46,6 +48,12 @@ class PlanExecutionVM:
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.steps: Dict[str, Step] = {}
 
+        # Successful steps are committed in groups of commit_batch_size; a
+        # size of 1 keeps one commit per step, and 0 defers every step to a
+        # single commit when the plan finishes, fails or is flushed.
+        self.commit_batch_size = max(0, commit_batch_size)
+        self._pending_commits: List[Dict[str, Any]] = []
+
         self.handlers_registered = False
         self.register_handlers()
         if not self.set_state(self.branch_manager.get_current_commit_hash()):
@@ -94,7 +102,12 @@ class PlanExecutionVM:
         self.logger.info("Registered handler for instruction: %s", instruction_name)
 
     def set_plan(self, reasoning: str, plan: List[Dict[str, Any]]) -> None:
-        """Set the plan for the VM and save the state."""
+        """Set the plan for the VM and save the state.
+
+        Steps still buffered by commit batching ran under the old plan, so
+        they are committed first.
+        """
+        self.flush_commits()
         self.state["current_plan"] = plan
         self.state["reasoning"] = reasoning
         self.save_state()
@@ -158,19 +171,23 @@ class PlanExecutionVM:
 
         input_parameters = {k: self._preview_value(v) for k, v in input_vars.items()}
 
-        self.logger.info(
-            "Commit message -  %s with parameters: %s",
-            description,
-            json.dumps(params, ensure_ascii=False),
-        )
+        # Only serialize the parameters when INFO is actually emitted.
+        log_info = self.logger.isEnabledFor(logging.INFO)
+        if log_info:
+            self.logger.info(
+                "Commit message -  %s with parameters: %s",
+                description,
+                json.dumps(params, ensure_ascii=False),
+            )
         if output_parameters:
             output_parameters = {
                 k: self._preview_value(v) for k, v in output_parameters.items()
             }
-            self.logger.info(
-                "Output variables: %s",
-                json.dumps(output_parameters, ensure_ascii=False),
-            )
+            if log_info:
+                self.logger.info(
+                    "Output variables: %s",
+                    json.dumps(output_parameters, ensure_ascii=False),
+                )
 
         return {
             "description": description,
@@ -268,6 +285,7 @@ class PlanExecutionVM:
                     f"Failed to execute step {current_step.seq_no}: {step_result}"
                 )
 
+                self.flush_commits()
                 commit_hash = self.branch_manager.commit_changes(
                     commit_info={
                         "type": CommitType.STEP_EXECUTION.value,
@@ -320,13 +338,20 @@ class PlanExecutionVM:
 
             self.save_state()
 
-            commit_hash = self.branch_manager.commit_changes(
-                commit_info={
+            self._pending_commits.append(
+                {
                     "type": CommitType.STEP_EXECUTION.value,
                     "seq_no": current_step.seq_no,
                     **commit_message_dict,
                 }
             )
+            commit_hash = None
+            if (
+                0 < self.commit_batch_size <= len(self._pending_commits)
+                or self.state["goal_completed"]
+                or self.state["program_counter"] >= len(self.state["current_plan"])
+            ):
+                commit_hash = self.flush_commits()
 
             return {
                 "success": True,
@@ -349,6 +374,35 @@ class PlanExecutionVM:
                 "error": f"Error in step {self.state['program_counter']}: {str(e)}",
             }
 
+    def flush_commits(self) -> Optional[str]:
+        """Commit the step executions buffered by commit batching.
+
+        A batch of several steps becomes one commit whose message carries the
+        per-step messages under "steps". Returns the new commit hash, or None
+        when nothing was pending.
+        """
+        if not self._pending_commits:
+            return None
+        pending, self._pending_commits = self._pending_commits, []
+        if len(pending) == 1:
+            return self.branch_manager.commit_changes(commit_info=pending[0])
+
+        input_parameters: Dict[str, Any] = {}
+        output_variables: Dict[str, Any] = {}
+        for commit_info in pending:
+            input_parameters.update(commit_info.get("input_parameters") or {})
+            output_variables.update(commit_info.get("output_variables") or {})
+        return self.branch_manager.commit_changes(
+            commit_info={
+                "type": CommitType.STEP_EXECUTION.value,
+                "seq_no": pending[-1]["seq_no"],
+                "description": "\n".join(c["description"] for c in pending),
+                "input_parameters": input_parameters,
+                "output_variables": output_variables,
+                "steps": pending,
+            }
+        )
+
     def set_variable(self, var_name: str, value: Any) -> None:
         self.variable_manager.set(var_name, value)
 
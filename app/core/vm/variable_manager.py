@@ -1,6 +1,14 @@
 from typing import Any, Dict
 from threading import Lock
 import re
+import sys
+
+# Define the regex pattern:
+# \${          matches the string '${'
+# (\w+)        captures the variable name consisting of word characters (letters, digits, underscores)
+# (?:\.\w+)?   non-capturing group that optionally matches '.sub_var'
+# \}           matches the closing '}'
+_VARIABLE_REFERENCE_RE = re.compile(r"\$\{(\w+)(?:\.\w+)?\}")
 
 
 class VariableManager:
@@ -11,16 +19,75 @@ class VariableManager:
     def __init__(self):
         self.variables = {}
         self.variable_refs = {}
+        # Names whose reference count dropped to zero since the last
+        # garbage_collect. None means unknown, forcing one full scan.
+        self._dead_vars = set()
+        # False while variables/variable_refs still alias the dicts handed
+        # to set_all_variables; the first mutation takes private copies.
+        self._owned = True
+        # Compiled `${name}` / `${name.sub}` matcher for the current variable
+        # names; None until first needed after the name set changes.
+        self._reference_pattern = None
+        # Bumped whenever a variable value may have changed. Reference count
+        # updates leave it alone since they never change interpolation output.
+        self._gen = 0
         self._lock = Lock()
 
+    def generation(self) -> int:
+        """Return a counter that changes whenever a variable is set or removed.
+
+        Values mutated in place through get() do not change it.
+        """
+        with self._lock:
+            return self._gen
+
+    def _bump_generation(self) -> None:
+        self._gen += 1
+
+    def _ensure_owned(self) -> None:
+        if self._owned:
+            return
+        # Keys loaded from JSON are fresh strings; intern them so every
+        # lookup and state reload shares one copy of each name. Values
+        # are kept by reference, the copy is shallow.
+        self.variables = {sys.intern(k): v for k, v in self.variables.items()}
+        self.variable_refs = {sys.intern(k): v for k, v in self.variable_refs.items()}
+        self._owned = True
+
+    def _get_reference_pattern(self):
+        """Return a regex matching references to any current variable."""
+        if self._reference_pattern is None:
+            # Longest names first so a name is never shadowed by its prefix.
+            names = sorted(self.variables, key=len, reverse=True)
+            alternation = "|".join(map(re.escape, names))
+            self._reference_pattern = re.compile(
+                rf"\$\{{({alternation})(?:\.([^}}]*))?\}}"
+            )
+        return self._reference_pattern
+
+    def _track_ref_count(self, var_name: str, reference_count: int) -> None:
+        if self._dead_vars is None:
+            return
+        if reference_count <= 0:
+            self._dead_vars.add(var_name)
+        else:
+            self._dead_vars.discard(var_name)
+
     def set(self, var_name: str, value: Any, reference_count: int = 1) -> None:
         with self._lock:
+            self._ensure_owned()
+            if var_name not in self.variables:
+                self._reference_pattern = None
             self.variables[var_name] = value
+            self._bump_generation()
             self.variable_refs[var_name] = reference_count
+            self._track_ref_count(var_name, reference_count)
 
     def set_reference_count(self, var_name: str, reference_count: int) -> None:
         with self._lock:
+            self._ensure_owned()
             self.variable_refs[var_name] = reference_count
+            self._track_ref_count(var_name, reference_count)
 
     def get(self, var_name: str) -> Any:
         with self._lock:
@@ -29,14 +96,27 @@ class VariableManager:
     def decrease_ref_count(self, var_name: str) -> None:
         with self._lock:
             if var_name in self.variable_refs:
+                self._ensure_owned()
                 self.variable_refs[var_name] -= 1
+                self._track_ref_count(var_name, self.variable_refs[var_name])
 
     def garbage_collect(self) -> None:
         with self._lock:
-            for var_name in list(self.variable_refs.keys()):
-                if self.variable_refs[var_name] <= 0:
-                    del self.variables[var_name]
-                    del self.variable_refs[var_name]
+            dead_vars = self._dead_vars
+            if dead_vars is None:
+                dead_vars = [
+                    var_name
+                    for var_name, count in self.variable_refs.items()
+                    if count <= 0
+                ]
+            if dead_vars:
+                self._ensure_owned()
+                self._reference_pattern = None
+                self._bump_generation()
+            for var_name in dead_vars:
+                self.variables.pop(var_name, None)
+                self.variable_refs.pop(var_name, None)
+            self._dead_vars = set()
 
     def get_all_variables(self) -> Dict[str, Any]:
         with self._lock:
@@ -50,24 +130,63 @@ class VariableManager:
         self, variables: Dict[str, Any], variables_refs: Dict[str, Any]
     ) -> None:
         with self._lock:
-            self.variables = variables.copy()
-            self.variable_refs = variables_refs.copy()
+            # Alias the caller's dicts; they are copied on first mutation.
+            self.variables = variables
+            self.variable_refs = variables_refs
+            self._owned = False
+            self._dead_vars = None
+            self._reference_pattern = None
+            self._bump_generation()
 
     def interpolate_variables(self, text: Any) -> Any:
         """Interpolate variables in the given text."""
         if not isinstance(text, str):
             return text
 
+        if "${" not in text:
+            return text
+
         with self._lock:
-            for var, value in self.variables.items():
-                # Replace simple variable references
-                text = text.replace(f"${{{var}}}", str(value))
+            if not self.variables:
+                return text
+            variables = self.variables
 
+            def substitute(match):
+                value = variables[match.group(1)]
+                sub_var = match.group(2)
+                # Replace simple variable references
+                if sub_var is None:
+                    return value if type(value) is str else str(value)
                 # Replace structured variable references if the value is a dictionary
-                if isinstance(value, dict):
-                    for sub_var, sub_value in value.items():
-                        text = text.replace(f"${{{var}.{sub_var}}}", str(sub_value))
-
+                if isinstance(value, dict) and sub_var in value:
+                    sub_value = value[sub_var]
+                    return sub_value if type(sub_value) is str else str(sub_value)
+                return match.group(0)
+
+            # One pass over the text instead of a str.replace per variable.
+            pattern = self._get_reference_pattern()
+            result = pattern.sub(substitute, text)
+            if pattern.search(result) is not None:
+                # A substituted value carried a reference of its own (or one
+                # is unresolvable); replay the sequential replacement so
+                # chained references resolve exactly as they always have.
+                result = self._interpolate_sequentially(text)
+            return result
+
+    def _interpolate_sequentially(self, text: str) -> str:
+        """Replace references one variable at a time, in insertion order.
+
+        Text substituted for one variable is searched again for the
+        variables after it. Callers must hold self._lock.
+        """
+        for var, value in self.variables.items():
+            # Replace simple variable references
+            text = text.replace(f"${{{var}}}", str(value))
+
+            # Replace structured variable references if the value is a dictionary
+            if isinstance(value, dict):
+                for sub_var, sub_value in value.items():
+                    text = text.replace(f"${{{var}.{sub_var}}}", str(sub_value))
         return text
 
     def find_referenced_variables(self, text: Any) -> list:
@@ -75,18 +194,23 @@ class VariableManager:
         if not isinstance(text, str):
             return []
 
+        if "${" not in text:
+            return []
+
         referenced_vars = set()
         with self._lock:
-            for var in self.variables.keys():
+            if not self.variables:
+                return []
+            for match in self._get_reference_pattern().finditer(text):
+                var, sub_var = match.groups()
                 # Check for simple variable reference
-                if f"${{{var}}}" in text:
+                if sub_var is None:
                     referenced_vars.add(var)
                 # Check for structured variable reference
-                elif isinstance(self.variables.get(var), dict) and any(
-                    f"${{{var}.{sub_var}}}" in text
-                    for sub_var in self.variables[var].keys()
-                ):
-                    referenced_vars.add(var)
+                else:
+                    value = self.variables[var]
+                    if isinstance(value, dict) and sub_var in value:
+                        referenced_vars.add(var)
 
         return list(referenced_vars)
 
@@ -99,14 +223,8 @@ class VariableManager:
             return []
 
         referenced_vars = set()
-        # Define the regex pattern:
-        # \${          matches the string '${'
-        # (\w+)        captures the variable name consisting of word characters (letters, digits, underscores)
-        # (?:\.\w+)?   non-capturing group that optionally matches '.sub_var'
-        # \}           matches the closing '}'
-        pattern = re.compile(r"\$\{(\w+)(?:\.\w+)?\}")
         # Use findall to extract all matching variable names
-        matches = pattern.findall(text)
+        matches = _VARIABLE_REFERENCE_RE.findall(text)
         # Remove duplicates by converting to a set and then back to a list
         referenced_vars = set(matches)
 
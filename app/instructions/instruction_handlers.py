@@ -3,7 +3,7 @@ import json
 from typing import Any, Dict, Optional, List, Union, Tuple
 from inspect import signature
 
-from app.utils import find_first_json_object
+from app.utils import parse_first_json_object
 from .tools import ToolsHub
 from .math_expression_eval import is_math_expression, ExpressionEvaluator
 
@@ -49,17 +49,9 @@ class InstructionHandlers:
             # Attempt to parse instruction_output as JSON if it's a string
             parsed_output = None
             if isinstance(instruction_output, str):
-                json_object = find_first_json_object(instruction_output)
-                if json_object:
-                    try:
-                        parsed_output = json.loads(json_object)
-                        self.vm.logger.debug(f"Parsed JSON output: {parsed_output}")
-                    except json.JSONDecodeError:
-                        self.vm.logger.debug(
-                            "instruction_output is a string but not a valid JSON. %s",
-                            e,
-                        )
-                        raise json.JSONDecodeError(f"{e}, data: {instruction_output}")
+                parsed_output = parse_first_json_object(instruction_output)
+                if parsed_output is not None:
+                    self.vm.logger.debug(f"Parsed JSON output: {parsed_output}")
 
             if not parsed_output or not isinstance(parsed_output, dict):
                 raise ValueError(
@@ -210,20 +202,31 @@ class InstructionHandlers:
             )
 
             try:
-                json_object = find_first_json_object(response)
-                if json_object is None:
-                    raise ValueError(
-                        f"No JSON object found in the response: {response}."
+                parsed_response = parse_first_json_object(response)
+                if parsed_response is None:
+                    # Let a retry reach the LLM instead of replaying this response.
+                    self.vm.llm_interface.discard_cached_response(
+                        condition_prompt_with_response_format, context
+                    )
+                    return (
+                        False,
+                        {
+                            "error_message": f"Failed to parse JSON response from LLM: {response}.",
+                            "instruction": "jmp",
+                            "params": params,
+                        },
                     )
-                parsed_response = json.loads(json_object)
                 condition_result = parsed_response.get("result")
                 explanation = parsed_response.get("explanation", "")
 
                 if not isinstance(condition_result, bool):
+                    self.vm.llm_interface.discard_cached_response(
+                        condition_prompt_with_response_format, context
+                    )
                     return (
                         False,
                         {
-                            "error_message": f"Invalid condition result type: {type(condition_result)} in response {json_object}. Expected boolean.",
+                            "error_message": f"Invalid condition result type: {type(condition_result)} in response {parsed_response}. Expected boolean.",
                             "instruction": "jmp",
                             "params": params,
                         },
@@ -240,15 +243,6 @@ class InstructionHandlers:
                 )
 
                 return True, {"target_seq": target_seq}
-            except json.JSONDecodeError:
-                return (
-                    False,
-                    {
-                        "error_message": f"Failed to parse JSON response from LLM: {response}.",
-                        "instruction": "jmp",
-                        "params": params,
-                    },
-                )
             except Exception as e:
                 return (
                     False,
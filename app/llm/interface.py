@@ -1,6 +1,10 @@
+from collections import OrderedDict
+import hashlib
 import logging
+import threading
 from typing import Optional, Generator
 
+from app.config.settings import LLM_RESPONSE_CACHE_SIZE
 from app.llm.base import BaseLLMProvider
 from app.llm.providers import (
     OpenAIProvider,
@@ -13,9 +17,22 @@ from app.llm.providers import (
 logger = logging.getLogger(__name__)
 
 
+def _response_cache_key(prompt: str, context: Optional[str], kwargs: dict) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in (prompt, context or "", repr(sorted(kwargs.items()))):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.digest()
+
+
 class LLMInterface:
     def __init__(self, provider: str, model: str, **kwargs):
         self.provider = self._get_provider(provider.lower(), model, **kwargs)
+        # Exact-match cache of generate() responses keyed by a prompt digest;
+        # disabled unless LLM_RESPONSE_CACHE_SIZE is positive.
+        self.response_cache_size = LLM_RESPONSE_CACHE_SIZE
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
 
     def _get_provider(self, provider: str, model: str, **kwargs) -> BaseLLMProvider:
         if provider == "openai":
@@ -32,14 +49,46 @@ class LLMInterface:
             raise ValueError(f"Unsupported LLM provider: {provider}")
 
     def generate(
-        self, prompt: str, context: Optional[str] = None, **kwargs
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+        nocache: bool = False,
+        **kwargs,
     ) -> Optional[str]:
+        """Generate a response, reusing a cached one for an identical request.
+
+        Pass nocache=True for prompts whose answer must reflect fresh state.
+        """
+        use_cache = self.response_cache_size > 0 and not nocache
+        if use_cache:
+            key = _response_cache_key(prompt, context, kwargs)
+            with self._response_cache_lock:
+                cached = self._response_cache.get(key)
+                if cached is not None:
+                    self._response_cache.move_to_end(key)
+                    return cached
+
         try:
-            return self.provider.generate(prompt, context, **kwargs)
+            response = self.provider.generate(prompt, context, **kwargs)
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
             raise e
 
+        if use_cache and response is not None:
+            with self._response_cache_lock:
+                self._response_cache[key] = response
+                while len(self._response_cache) > self.response_cache_size:
+                    self._response_cache.popitem(last=False)
+        return response
+
+    def discard_cached_response(
+        self, prompt: str, context: Optional[str] = None, **kwargs
+    ) -> None:
+        """Drop a cached response, e.g. one the caller failed to parse."""
+        key = _response_cache_key(prompt, context, kwargs)
+        with self._response_cache_lock:
+            self._response_cache.pop(key, None)
+
     def evaluate_condition(
         self, prompt: str, context: Optional[str] = None
     ) -> Optional[str]:
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 
 
 class BranchManager(ABC):
@@ -31,6 +31,10 @@ class BranchManager(ABC):
     def get_current_commit_hash(self) -> str:
         """Retrieve the current commit hash."""
 
+    @abstractmethod
+    def get_branch_head(self, branch_name: str) -> Optional[str]:
+        """Get the commit hash at the tip of the branch, or None if unknown."""
+
     @abstractmethod
     def get_parent_commit_hash(self, commit_hash: str) -> str:
         """Retrieve the parent commit hash based on the commit hash."""
@@ -39,6 +43,35 @@ class BranchManager(ABC):
     def get_commits(self, branch_name: str) -> List[Any]:
         """Get all commits from the specified branch."""
 
+    def iter_commits(self, branch_name: str) -> Iterator[Dict[str, Any]]:
+        """Iterate over the commits of the specified branch.
+
+        Backends that can produce commits incrementally should override this;
+        the default simply walks get_commits.
+        """
+        yield from self.get_commits(branch_name)
+
+    def get_commits_page(
+        self, branch_name: str, limit: int, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get up to limit commits of the branch, newest first.
+
+        cursor is the commit hash to start from, as returned in next_cursor
+        by the previous page; None starts at the branch head.
+        """
+        commits = self.get_commits(branch_name)
+        start = 0
+        if cursor is not None:
+            start = next(
+                (i for i, c in enumerate(commits) if c["commit_hash"] == cursor),
+                len(commits),
+            )
+        end = start + limit
+        return {
+            "commits": commits[start:end],
+            "next_cursor": commits[end]["commit_hash"] if end < len(commits) else None,
+        }
+
     @abstractmethod
     def get_latest_commit(self, branch_name: Optional[str] = "main") -> Dict[str, Any]:
         """Get the latest commit for specified branch"""
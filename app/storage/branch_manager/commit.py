@@ -1,5 +1,8 @@
 import json
 from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from app.utils import json_loads
 
 
 class CommitType(Enum):
@@ -13,26 +16,44 @@ class CommitType(Enum):
     STEP_OPTIMIZATION = "StepOptimization"
 
 
+def _decode_commit_info(message) -> Optional[Dict[str, Any]]:
+    """The JSON object a commit message holds, or None for plain text."""
+    if isinstance(message, dict):
+        return message
+    commit_info = None
+    # Plain-text messages such as "Initial commit" never hold JSON; skip
+    # the decoder and the exception it would raise.
+    if message.lstrip().startswith("{"):
+        try:
+            commit_info = json_loads(message)
+        except json.JSONDecodeError:
+            pass
+    return commit_info if isinstance(commit_info, dict) else None
+
+
+def parse_commit_steps(message) -> List[Dict[str, Any]]:
+    """Per-step commit infos of a commit made by commit batching.
+
+    Returns an empty list for commits that record a single step.
+    """
+    commit_info = _decode_commit_info(message)
+    return (commit_info or {}).get("steps") or []
+
+
 def parse_commit_message(message) -> tuple:
     """Parse a commit message and return its components."""
-    seq_no = "Unknown"
-    try:
-        if isinstance(message, dict):
-            commit_info = message
-        else:
-            commit_info = json.loads(message)
-        description = commit_info.get("description", "No description")
-        details = {
-            "input_parameters": commit_info.get("input_parameters", {}),
-            "output_variables": commit_info.get("output_variables", {}),
-            "execution_error": commit_info.get("execution_error", None),
-        }
-
-        commit_type = commit_info.get("type", "General")
-        seq_no = commit_info.get("seq_no", "Unknown")
-    except json.JSONDecodeError:
-        description = message
-        details = {}
-        commit_type = "General"
+    commit_info = _decode_commit_info(message)
+    if commit_info is None:
+        return "Unknown", message, {}, "General"
+
+    description = commit_info.get("description", "No description")
+    details = {
+        "input_parameters": commit_info.get("input_parameters", {}),
+        "output_variables": commit_info.get("output_variables", {}),
+        "execution_error": commit_info.get("execution_error", None),
+    }
+
+    commit_type = commit_info.get("type", "General")
+    seq_no = commit_info.get("seq_no", "Unknown")
 
     return seq_no, description, details, commit_type
@@ -1,15 +1,388 @@
-from datetime import datetime
+import atexit
+from collections import OrderedDict
 import os
+import re
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 from git import Repo, GitCommandError
 import logging
-import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List, Sequence, Tuple
 
+from app.config.settings import (
+    GIT_COMMIT_ROWS_CACHE_BYTES,
+    GIT_DIFF_CACHE_BYTES,
+    VM_STATE_CACHE_BYTES,
+)
 from app.storage.branch_manager.commit import parse_commit_message
+from app.utils import json_dumps, json_loads
 from app.storage.branch_manager.base import BranchManager
 
 logger = logging.getLogger(__name__)
 
+# GitPython's persistent `git cat-file --batch` process is not thread-safe.
+_object_read_lock = threading.Lock()
+
+# Repos used by the module-level read helpers below, least recently used
+# first, each stored with the identity of the .git directory it was opened
+# on; guarded by _repo_open_lock so concurrent requests never build duplicate
+# Repos. Their persistent cat-file pipes are only used under
+# _object_read_lock; every other command they run spawns its own git process.
+# GitManagers keep their own Repo, whose object reads are not locked.
+_repo_pool: "OrderedDict[str, Tuple[Optional[tuple], Repo]]" = OrderedDict()
+_REPO_POOL_SIZE = 8
+_repo_open_lock = threading.Lock()
+
+_FULL_SHA_RE = re.compile(r"[0-9a-f]{40}")
+
+# Process umask, read once at import: os.umask can only be queried by setting
+# it, which is not safe to do while other threads create files.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_has_content(path: str, payload: bytes) -> bool:
+    """Return True if the file at path already holds exactly payload."""
+    try:
+        if os.path.getsize(path) != len(payload):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == payload
+    except OSError:
+        return False
+
+
+def _git_dir_identity(repo_path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(os.path.join(repo_path, ".git"))
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _close_repo(repo: Repo) -> None:
+    # Stop its persistent git children now rather than whenever the Repo is
+    # collected. Pooled Repos only use those pipes under _object_read_lock, so
+    # no read is cut off; a helper still holding the Repo respawns them.
+    with _object_read_lock:
+        repo.close()
+
+
+def _get_repo(repo_path: str) -> Repo:
+    """Open the repository at repo_path for the read helpers, reusing it.
+
+    Refs and new packs are read fresh by the pooled Repo, so it stays valid
+    across commits and checkouts. It is only rebuilt when .git itself has
+    been replaced, e.g. the task directory was deleted and recreated.
+    """
+    identity = _git_dir_identity(repo_path)
+    with _repo_open_lock:
+        entry = _repo_pool.pop(repo_path, None)
+        if entry is not None:
+            if entry[0] == identity:
+                _repo_pool[repo_path] = entry
+                return entry[1]
+            _close_repo(entry[1])
+        repo = Repo(repo_path)
+        _repo_pool[repo_path] = (identity, repo)
+        while len(_repo_pool) > _REPO_POOL_SIZE:
+            _, (_, evicted) = _repo_pool.popitem(last=False)
+            _close_repo(evicted)
+        return repo
+
+
+@atexit.register
+def _close_pooled_repos() -> None:
+    """Stop the persistent `git cat-file` processes of pooled repos at exit."""
+    with _repo_open_lock:
+        for _, repo in _repo_pool.values():
+            repo.close()
+        _repo_pool.clear()
+
+
+def _read_state_blob(repo: Repo, commit_hash: str) -> bytes:
+    """Read vm_state.json at the given commit.
+
+    The blob is fetched through the repository's long-lived
+    `git cat-file --batch` process instead of spawning `git show` per call.
+    A missing file raises ValueError.
+    """
+    ref = f"{commit_hash}:vm_state.json"
+    try:
+        with _object_read_lock:
+            _, _, _, data = repo.git.get_object_data(ref)
+        return data
+    except OSError as e:
+        logger.warning("cat-file process unavailable, falling back to git show: %s", e)
+        with _object_read_lock:
+            repo.git.clear_cache()
+        return repo.git.show(ref)
+
+
+class _ByteBoundedLRU:
+    """Thread-safe LRU cache bounded by the total in-memory size of its values.
+
+    Counting entries is not enough for blobs and patches, whose sizes vary
+    by orders of magnitude; every gunicorn worker holds its own copy.
+    Values larger than the whole budget are not cached at all.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: tuple, value: Any, size: Optional[int] = None) -> None:
+        """Cache value under key; size defaults to sys.getsizeof(value).
+
+        Pass size for containers, whose getsizeof excludes their contents.
+        """
+        if size is None:
+            size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Raw vm_state.json blobs keyed by (repo_path, full commit sha). A commit
+# hash names immutable content, so an entry never goes stale. The raw bytes
+# are cached rather than the decoded dict so every caller still gets its own
+# mutable state from json_loads.
+_state_blob_cache = _ByteBoundedLRU(VM_STATE_CACHE_BYTES)
+
+# Cached for listed commits that have no vm_state.json. An empty blob is never
+# a valid state, so it cannot be confused with a real entry.
+_MISSING_STATE_BLOB = b""
+
+
+def _get_cached_state_blob(repo_path: str, commit_hash: str) -> Optional[bytes]:
+    return _state_blob_cache.get((repo_path, commit_hash))
+
+
+def _put_cached_state_blob(repo_path: str, commit_hash: str, data: bytes) -> None:
+    _state_blob_cache.put((repo_path, commit_hash), data)
+
+
+def _read_commit_state_blob(repo_path: str, commit_hash: str) -> bytes:
+    """Cached vm_state.json blob for a full commit hash."""
+    data = _get_cached_state_blob(repo_path, commit_hash)
+    if data == _MISSING_STATE_BLOB:
+        raise ValueError(f"{commit_hash}:vm_state.json missing")
+    if data is None:
+        data = _read_state_blob(_get_repo(repo_path), commit_hash)
+        _put_cached_state_blob(repo_path, commit_hash, data)
+    return data
+
+
+# Patches keyed by (repo_path, full commit sha); immutable like the blobs.
+_diff_cache = _ByteBoundedLRU(GIT_DIFF_CACHE_BYTES)
+
+
+def _diff_commit(
+    repo_path: str, commit_hash: str, parent_hash: Optional[str] = None
+) -> str:
+    """Patch for a full commit hash against its first parent, memoized.
+
+    parent_hash is the commit's first parent, or None for a root commit.
+    """
+    key = (repo_path, commit_hash)
+    diff = _diff_cache.get(key)
+    if diff is None:
+        # Comparing two explicit trees keeps merge commits diffed against
+        # their first parent, where a single-commit diff-tree prints nothing.
+        revs = (parent_hash, commit_hash) if parent_hash else ("--root", commit_hash)
+        diff = _get_repo(repo_path).git.diff_tree(
+            "-p", "--unified=3", "--no-commit-id", *revs
+        )
+        _diff_cache.put(key, diff)
+    return diff
+
+
+def _iter_state_blobs(
+    repo: Repo, commit_hashes: List[str]
+) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """Yield vm_state.json for many commits through one `git cat-file --batch`.
+
+    All requests are written from a helper thread while this thread reads the
+    replies, so git never waits on a round trip per commit and neither side
+    can block on a full pipe. Commits without the file yield None.
+    """
+    proc = repo.git.cat_file("--batch", as_process=True, istream=subprocess.PIPE)
+
+    def write_requests():
+        try:
+            for commit_hash in commit_hashes:
+                proc.stdin.write(f"{commit_hash}:vm_state.json\n".encode())
+            proc.stdin.close()
+        except OSError:
+            # The reader notices the early exit and raises.
+            pass
+
+    # A dedicated thread per batch: a slowly drained listing keeps its writer
+    # blocked on a full pipe, which must never hold up another listing.
+    writer = threading.Thread(
+        target=write_requests, name="git-cat-file-writer", daemon=True
+    )
+    writer.start()
+    completed = False
+    try:
+        for commit_hash in commit_hashes:
+            header = proc.stdout.readline().split()
+            if not header:
+                raise OSError("git cat-file --batch exited early")
+            if header[-1] == b"missing":
+                yield commit_hash, None
+                continue
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)  # trailing newline
+            yield commit_hash, data
+        completed = True
+    finally:
+        if not completed:
+            # Abandoned or failed: unblock the writer by ending the process.
+            proc.kill()
+        writer.join()
+        proc.stdout.close()
+        try:
+            proc.wait()
+        except GitCommandError:
+            if completed:
+                raise
+
+
+def _iter_commit_state_blobs(
+    repo_path: str, commit_hashes: List[str]
+) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """Cached vm_state.json blobs for many full commit hashes, in order."""
+    cached = {}
+    for commit_hash in commit_hashes:
+        data = _get_cached_state_blob(repo_path, commit_hash)
+        if data is not None:
+            cached[commit_hash] = None if data == _MISSING_STATE_BLOB else data
+    uncached = [h for h in commit_hashes if h not in cached]
+    if not uncached:
+        for commit_hash in commit_hashes:
+            yield commit_hash, cached[commit_hash]
+        return
+
+    # Replies arrive in request order, so the next uncached hash is always
+    # answered by the next blob from the batch reader.
+    fetched = _iter_state_blobs(_get_repo(repo_path), uncached)
+    try:
+        for commit_hash in commit_hashes:
+            if commit_hash in cached:
+                yield commit_hash, cached[commit_hash]
+                continue
+            _, data = next(fetched)
+            # These hashes come from git log, so "missing" here means the
+            # commit exists without the file; that cannot change later.
+            _put_cached_state_blob(
+                repo_path, commit_hash, _MISSING_STATE_BLOB if data is None else data
+            )
+            yield commit_hash, data
+    finally:
+        fetched.close()
+
+
+def _read_commit_rows(
+    repo: Repo, rev: str, max_count: Optional[int] = None
+) -> List[Tuple[str, int, str]]:
+    """List (hexsha, committed_date, message) for rev and its ancestors.
+
+    One `git log` returns every field, where iter_commits would read each
+    commit object separately as soon as its message or date is accessed.
+    """
+    # Each record starts with RS and its fields are split by US, so messages
+    # may contain anything except those two control characters.
+    args = [rev, "--format=%x1e%H%x1f%ct%x1f%B"]
+    if max_count is not None:
+        args.append(f"--max-count={max_count}")
+    output = repo.git.log(*args)
+    rows = []
+    for record in output.split("\x1e")[1:]:
+        commit_hash, committed_date, message = record.split("\x1f", 2)
+        # git log terminates each message with an extra newline.
+        if message.endswith("\n"):
+            message = message[:-1]
+        rows.append((commit_hash, int(committed_date), message))
+    return rows
+
+
+# Commit rows keyed by (repo_path, full commit sha, max_count). Rows carry
+# whole commit messages, so the cache is bounded by their size too.
+_commit_rows_cache = _ByteBoundedLRU(GIT_COMMIT_ROWS_CACHE_BYTES)
+
+
+def _read_cached_commit_rows(
+    repo_path: str, commit_hash: str, max_count: Optional[int] = None
+) -> Tuple[Tuple[str, int, str], ...]:
+    """_read_commit_rows for a full commit hash, whose history never changes."""
+    key = (repo_path, commit_hash, max_count)
+    rows = _commit_rows_cache.get(key)
+    if rows is None:
+        rows = tuple(_read_commit_rows(_get_repo(repo_path), commit_hash, max_count))
+        size = sys.getsizeof(rows) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(field) for field in row)
+            for row in rows
+        )
+        _commit_rows_cache.put(key, rows, size)
+    return rows
+
+
+# list_branches results per repo_path, stored with the _refs_signature they
+# were built from. GitManager drops its entry after its own ref updates; the
+# signature catches changes made by other processes.
+_branches_cache: Dict[str, Tuple[tuple, List[Dict[str, Any]]]] = {}
+_branches_cache_lock = threading.Lock()
+
+
+def _refs_signature(git_dir: str) -> tuple:
+    """File identities of everything that can change the branch list.
+
+    HEAD, packed-refs and every loose branch ref contribute their
+    (inode, mtime, size). Git updates refs by renaming a new file into
+    place, so even two updates within one mtime tick change the inode; an
+    in-place rewrite still changes the mtime or size. The ref directories
+    themselves are included so that added and removed refs are noticed.
+    """
+    paths = [os.path.join(git_dir, "HEAD"), os.path.join(git_dir, "packed-refs")]
+    for dirpath, _, filenames in os.walk(os.path.join(git_dir, "refs", "heads")):
+        paths.append(dirpath)
+        paths.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_ino, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((path, None))
+    return tuple(signature)
+
 
 class GitManager(BranchManager):
     def __init__(self, repo_path):
@@ -17,11 +390,13 @@ class GitManager(BranchManager):
         self.repo = self._initialize_repo()
 
     def _initialize_repo(self):
-        if not os.path.exists(self.repo_path):
-            os.makedirs(self.repo_path)
-            logger.info("Created directory: %s", self.repo_path)
-
+        # An existing repository is the common case; a single stat of .git
+        # covers it without checking the working directory separately.
         if not os.path.exists(os.path.join(self.repo_path, ".git")):
+            if not os.path.exists(self.repo_path):
+                os.makedirs(self.repo_path)
+                logger.info("Created directory: %s", self.repo_path)
+
             repo = Repo.init(self.repo_path)
             logger.info("Initialized new Git repository in %s", self.repo_path)
 
@@ -47,21 +422,47 @@ class GitManager(BranchManager):
         return repo
 
     def list_branches(self):
-        branches = self.repo.branches
-        branch_data = [
-            {
-                "name": branch.name,
-                "last_commit_date": branch.commit.committed_datetime.isoformat(),
-                "last_commit_hash": branch.commit.hexsha,
-                "last_commit_message": branch.commit.message.split("\n")[0],
-                "is_active": branch.name == self.get_current_branch(),
-            }
-            for branch in branches
-        ]
+        signature = _refs_signature(self.repo.git_dir)
+        with _branches_cache_lock:
+            cached = _branches_cache.get(self.repo_path)
+        if cached is not None and cached[0] == signature:
+            return [dict(branch) for branch in cached[1]]
+
+        current_branch = self.get_current_branch()
+        # One for-each-ref reads every branch tip's metadata instead of
+        # looking up each commit object. iso-strict matches
+        # committed_datetime.isoformat() and lines=1 the first message line.
+        output = self.repo.git.for_each_ref(
+            "--format=%(refname:lstrip=2)%00%(objectname)"
+            "%00%(committerdate:iso-strict)%00%(contents:lines=1)",
+            "refs/heads/",
+        )
+        branch_data = []
+        # Records end in "\n" only; splitlines() would also break on the
+        # Unicode line separators a JSON subject may contain unescaped.
+        for line in output.split("\n"):
+            if not line:
+                continue
+            name, hexsha, commit_date, subject = line.split("\0", 3)
+            branch_data.append(
+                {
+                    "name": name,
+                    "last_commit_date": commit_date,
+                    "last_commit_hash": hexsha,
+                    "last_commit_message": subject,
+                    "is_active": name == current_branch,
+                }
+            )
         branch_data.sort(
             key=lambda x: (-x["is_active"], x["last_commit_date"]), reverse=True
         )
-        return branch_data
+        with _branches_cache_lock:
+            _branches_cache[self.repo_path] = (signature, branch_data)
+        return [dict(branch) for branch in branch_data]
+
+    def _invalidate_branches(self) -> None:
+        with _branches_cache_lock:
+            _branches_cache.pop(self.repo_path, None)
 
     def checkout_branch(self, branch_name):
         try:
@@ -72,6 +473,7 @@ class GitManager(BranchManager):
 
             # Attempt to checkout the branch
             self.repo.git.checkout(branch_name)
+            self._invalidate_branches()
             logger.info("Checked out branch %s.", branch_name)
             return True
         except GitCommandError as e:
@@ -94,6 +496,7 @@ class GitManager(BranchManager):
             logger.info(f"Switched to branch {switch_to} before deleting {branch_name}")
 
         self.repo.git.branch("-D", branch_name)
+        self._invalidate_branches()
 
     def get_current_branch(self):
         return self.repo.active_branch.name
@@ -108,6 +511,7 @@ class GitManager(BranchManager):
             self.repo.git.branch(branch_name, commit_hash)
             logger.info(f"Created branch {branch_name} from commit {commit_hash}")
             self.repo.git.checkout(branch_name)
+            self._invalidate_branches()
             logger.info("Checked out branch %s.", branch_name)
             return True
         except GitCommandError as e:
@@ -120,6 +524,13 @@ class GitManager(BranchManager):
         """Retrieve the latest commit hash of the current branch."""
         return self.repo.head.commit.hexsha
 
+    def get_branch_head(self, branch_name: str) -> Optional[str]:
+        """Get the commit hash at the tip of the branch."""
+        try:
+            return self.repo.heads[branch_name].commit.hexsha
+        except (IndexError, ValueError):
+            return None
+
     def get_commit_hashes(self):
         """Retrieve all commit hashes of the current branch."""
         return [commit.hexsha for commit in self.repo.iter_commits()]
@@ -135,28 +546,7 @@ class GitManager(BranchManager):
     def get_commits(self, branch_name: str) -> List[Any]:
         """Get all commits from the specified branch."""
         try:
-            commits = list(self.repo.iter_commits(branch_name))
-            vm_states = []
-            for commit in commits:
-                commit_time = datetime.fromtimestamp(commit.committed_date)
-                seq_no, description, details, commit_type = parse_commit_message(
-                    commit.message
-                )
-
-                vm_state = self.load_state(commit.hexsha)
-                vm_states.append(
-                    {
-                        "time": commit_time.isoformat(),
-                        "title": description,
-                        "details": details,
-                        "commit_hash": commit.hexsha,
-                        "seq_no": seq_no,
-                        "vm_state": vm_state,
-                        "commit_type": commit_type,
-                        "message": commit.message,
-                    }
-                )
-            return vm_states
+            return list(self.iter_commits(branch_name))
         except Exception as e:
             logger.error(
                 "Error fetching commits for branch %s: %s",
@@ -166,6 +556,90 @@ class GitManager(BranchManager):
             )
             raise e
 
+    def iter_commits(self, branch_name: str) -> Iterator[Dict[str, Any]]:
+        """Yield the commits of the specified branch, newest first.
+
+        VM states are read from a single batched cat-file stream as the
+        caller consumes entries, so nothing beyond the current entry is
+        decoded ahead of time.
+        """
+        return self._iter_commit_entries(self._commit_rows(branch_name))
+
+    def get_commits_page(
+        self, branch_name: str, limit: int, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get up to limit commits of the branch, newest first, from cursor on.
+
+        Only the requested window is listed and its states read.
+        """
+        if cursor is not None and not _FULL_SHA_RE.fullmatch(cursor):
+            raise ValueError(f"Invalid commit cursor: {cursor}")
+        # One extra row tells whether another page follows and where it starts.
+        rows = self._commit_rows(cursor or branch_name, limit + 1)
+        next_cursor = rows[limit][0] if len(rows) > limit else None
+        return {
+            "commits": list(self._iter_commit_entries(rows[:limit])),
+            "next_cursor": next_cursor,
+        }
+
+    def _commit_rows(
+        self, rev: str, max_count: Optional[int] = None
+    ) -> Sequence[Tuple[str, int, str]]:
+        """Commit rows for rev, memoized when rev is a branch or full sha.
+
+        Resolving a branch tip only reads its ref, so a listing of an
+        unchanged branch skips `git log`; a moved tip is a new cache key.
+        """
+        if _FULL_SHA_RE.fullmatch(rev):
+            commit_hash = rev
+        else:
+            commit_hash = self.get_branch_head(rev)
+        if commit_hash is None:
+            return _read_commit_rows(self.repo, rev, max_count)
+        return _read_cached_commit_rows(self.repo_path, commit_hash, max_count)
+
+    def _iter_commit_entries(
+        self, rows: Sequence[Tuple[str, int, str]]
+    ) -> Iterator[Dict[str, Any]]:
+        blobs = _iter_commit_state_blobs(
+            self.repo_path, [commit_hash for commit_hash, _, _ in rows]
+        )
+        prev_data = prev_state = None
+        try:
+            for (commit_hash, committed_date, message), (_, data) in zip(rows, blobs):
+                # Neighbouring commits often carry an identical vm_state.json;
+                # comparing the bytes is far cheaper than decoding them again.
+                if data is None or data != prev_data:
+                    prev_data = data
+                    prev_state = self._decode_state(commit_hash, data)
+                yield self._commit_entry(
+                    commit_hash, committed_date, message, prev_state
+                )
+        finally:
+            blobs.close()
+
+    @staticmethod
+    def _commit_entry(
+        commit_hash: str,
+        committed_date: int,
+        message: str,
+        vm_state: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        # Same text as datetime.fromtimestamp(...).isoformat() for the whole
+        # seconds git records, without building a datetime per commit.
+        commit_time = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(committed_date))
+        seq_no, description, details, commit_type = parse_commit_message(message)
+        return {
+            "time": commit_time,
+            "title": description,
+            "details": details,
+            "commit_hash": commit_hash,
+            "seq_no": seq_no,
+            "vm_state": vm_state,
+            "commit_type": commit_type,
+            "message": message,
+        }
+
     def get_latest_commit(self, branch_name: Optional[str] = "main") -> Dict[str, Any]:
         """Get the latest commit in the branch."""
         try:
@@ -181,22 +655,12 @@ class GitManager(BranchManager):
     def get_commit(self, commit_hash: str) -> Any:
         try:
             commit = self.repo.commit(commit_hash)
-            commit_time = datetime.fromtimestamp(commit.committed_date)
-            seq_no, description, details, commit_type = parse_commit_message(
-                commit.message
+            return self._commit_entry(
+                commit.hexsha,
+                commit.committed_date,
+                commit.message,
+                self._load_commit_state(commit),
             )
-
-            vm_state = self.load_state(commit.hexsha)
-            return {
-                "time": commit_time.isoformat(),
-                "title": description,
-                "details": details,
-                "commit_hash": commit.hexsha,
-                "seq_no": seq_no,
-                "vm_state": vm_state,
-                "commit_type": commit_type,
-                "message": commit.message,
-            }
         except Exception as e:
             logger.error(
                 "Error fetching commit for hash %s: %s",
@@ -208,10 +672,11 @@ class GitManager(BranchManager):
 
     def commit_changes(self, commit_info: Dict[str, Any]) -> Optional[str]:
         try:
-            commit_message = json.dumps(commit_info, ensure_ascii=False)
+            commit_message = json_dumps(commit_info).decode("utf-8")
             self.repo.git.add(all=True)
             if self.repo.is_dirty(untracked_files=True):
                 commit = self.repo.index.commit(commit_message)
+                self._invalidate_branches()
                 return commit.hexsha  # Return the commit hash as a string
             else:
                 # If there are no changes to commit, return the latest commit hash
@@ -224,16 +689,45 @@ class GitManager(BranchManager):
             logger.error("Error committing changes: %s", str(e))
             raise e
 
+    def _load_commit_state(self, commit) -> Optional[Dict[str, Any]]:
+        """Load vm_state.json for a Commit object already in hand.
+
+        Its hexsha is always a full sha, so this goes straight to the
+        per-commit blob cache.
+        """
+        try:
+            data = _read_commit_state_blob(self.repo_path, commit.hexsha)
+        except (GitCommandError, ValueError) as e:
+            logger.error("Error loading state from commit %s: %s", commit.hexsha, e)
+            return None
+        return self._decode_state(commit.hexsha, data)
+
+    @staticmethod
+    def _decode_state(
+        commit_hash: str, data: Optional[bytes]
+    ) -> Optional[Dict[str, Any]]:
+        if data is None:
+            logger.error("vm_state.json not found in commit %s", commit_hash)
+            return None
+        try:
+            return json_loads(data)
+        except ValueError as e:
+            logger.error("Error loading state from commit %s: %s", commit_hash, e)
+        return None
+
     def load_state(self, commit_hash: str) -> Optional[Dict[str, Any]]:
         """Load the state from a specific commit."""
         try:
-            state_content = self.repo.git.show(f"{commit_hash}:vm_state.json")
-            return json.loads(state_content)
-        except (GitCommandError, json.JSONDecodeError) as e:
-            logger.error(f"Error loading state from commit {commit_hash}: {str(e)}")
+            if _FULL_SHA_RE.fullmatch(commit_hash):
+                state_content = _read_commit_state_blob(self.repo_path, commit_hash)
+            else:
+                state_content = _read_state_blob(self.repo, commit_hash)
+            return json_loads(state_content)
+        except (GitCommandError, ValueError) as e:
+            logger.error("Error loading state from commit %s: %s", commit_hash, e)
         except Exception as e:
             logger.error(
-                "Unexpected error loading state from commit %s: %s", commit_hash, str(e)
+                "Unexpected error loading state from commit %s: %s", commit_hash, e
             )
         return None
 
@@ -241,21 +735,37 @@ class GitManager(BranchManager):
         """Update the state to the current commit."""
         try:
             state_file = os.path.join(self.repo_path, "vm_state.json")
-            with open(state_file, "w") as f:
-                json.dump(state, f, indent=2, default=str, sort_keys=True)
+            payload = json_dumps(state, indent=True, sort_keys=True)
+            if _file_has_content(state_file, payload):
+                # Unchanged state: leave the file (and its stat info) alone.
+                return
+            # mkstemp creates the file 0600; keep the mode the state file had
+            # (or would get from the umask) so other readers keep access.
+            try:
+                mode = stat.S_IMODE(os.stat(state_file).st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            # Stage the new content inside .git so a crash never leaves a
+            # stray temp file in the work tree for the next `git add`.
+            fd, tmp_path = tempfile.mkstemp(
+                prefix="vm_state.", suffix=".tmp", dir=self.repo.git_dir
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    os.fchmod(f.fileno(), mode)
+                    f.write(payload)
+                os.replace(tmp_path, state_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
         except Exception as e:
-            logger.error(f"Error saving state: {str(e)}")
+            logger.error("Error saving state: %s", e)
             raise e
 
     def get_state_diff(self, commit_hash: str) -> str:
         commit = self.repo.commit(commit_hash)
-        if commit.parents:
-            parent = commit.parents[0]
-            return self.repo.git.diff(parent, commit, "--unified=3")
-        else:
-            return self.repo.git.show(
-                commit, "--pretty=format:", "--no-commit-id", "-p"
-            )
+        parent_hash = commit.parents[0].hexsha if commit.parents else None
+        return _diff_commit(self.repo_path, commit.hexsha, parent_hash)
 
     def __del__(self):
         if self.repo:
@@ -284,6 +284,12 @@ class MySQLBranchManager(BranchManager):
         """Get the current commit hash."""
         return self._current_commit_hash
 
+    def get_branch_head(self, branch_name: str) -> Optional[str]:
+        """Get the commit hash at the tip of the branch."""
+        with self.get_session() as session:
+            branch = self._get_branch(session, branch_name)
+            return branch.head_commit_hash if branch else None
+
     def get_commit_hashes(self):
         """Retrieve all commit hashes of the current branch."""
         with self.get_session() as session:
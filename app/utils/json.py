@@ -1,10 +1,95 @@
 import json
 import re
 import logging
-from typing import Optional
+from typing import Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+_JSON_FENCE_RE = re.compile(r"```json\s*([\s\S]*?)\s*```", re.DOTALL)
+_JSON_OPEN_FENCE_RE = re.compile(r"```json\s*([\s\S]*)", re.DOTALL)
+
+# Runs of 20+ digits may be integers beyond the 64-bit range orjson decodes
+# exactly. Matches inside strings only cost a stdlib decode.
+_WIDE_NUMBER_RE = re.compile(r"\d{20}")
+_WIDE_NUMBER_BYTES_RE = re.compile(rb"\d{20}")
+
+# Shared decoder for the bracket scanners; JSONDecoder holds no per-call state.
+_JSON_DECODER = json.JSONDecoder()
+
+
+def json_dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes.
+
+    Uses orjson when it is installed and falls back to the standard library
+    otherwise. Values that are not JSON serializable are converted with `str`.
+    Documents with values orjson cannot write faithfully (integers wider than
+    64 bits, NaN and Infinity) are encoded by the standard library, so
+    json_loads reads every value back unchanged.
+
+    Args:
+        obj (Any): The object to serialize.
+        indent (bool): Pretty-print with an indent of two spaces.
+        sort_keys (bool): Sort the keys of every dictionary.
+
+    Returns:
+        bytes: The encoded JSON document.
+    """
+    if orjson is not None:
+        # datetimes and dataclasses go through default=str like the stdlib
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, default=str, option=option)
+            # orjson writes NaN and Infinity as null, so a document with any
+            # null is re-encoded by the stdlib, which keeps them.
+            if b"null" not in data:
+                return data
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, which only the stdlib encoder accepts
+            pass
+
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        sort_keys=sort_keys,
+        default=str,
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Deserialize a JSON document, using orjson when it is installed.
+
+    Documents orjson would decode lossily (integers of 20 or more digits,
+    which it turns into floats) or rejects (NaN and Infinity, which the
+    stdlib writes) are decoded by the standard library instead.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        wide_number = (
+            _WIDE_NUMBER_BYTES_RE if isinstance(data, bytes) else _WIDE_NUMBER_RE
+        )
+        if not wide_number.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(data)
+
 
 def extract_json(plan_response: str) -> str:
     """Extract JSON from the plan response.
@@ -19,12 +104,11 @@ def extract_json(plan_response: str) -> str:
         ValueError: If no valid JSON content is found.
     """
     # First try to match JSON block with complete markdown code fence
-    json_code_block_pattern = re.compile(r"```json\s*([\s\S]*?)\s*```", re.DOTALL)
-    match = json_code_block_pattern.search(plan_response)
+    match = _JSON_FENCE_RE.search(plan_response)
     if match:
         json_str = match.group(1).strip()
         try:
-            return json.loads(json_str)
+            return json_loads(json_str)
         except json.JSONDecodeError as e:
             logger.warning(
                 "Failed to parse JSON use default pattern: %s, %s", json_str, e
@@ -37,18 +121,17 @@ def extract_json(plan_response: str) -> str:
     if first_marker != -1 and last_marker != -1 and first_marker < last_marker:
         json_str = plan_response[first_marker + 7 : last_marker].strip()
         try:
-            return json.loads(json_str)
+            return json_loads(json_str)
         except json.JSONDecodeError as e:
             logger.warning("Failed to parse JSON between markers: %s, %s", json_str, e)
 
     # Then try to match JSON block with only opening markdown fence
-    start_pattern = re.compile(r"```json\s*([\s\S]*)", re.DOTALL)
-    match = start_pattern.search(plan_response)
+    match = _JSON_OPEN_FENCE_RE.search(plan_response)
     if match:
         content = match.group(1).strip()
         if content:
             try:
-                return json.loads(content)
+                return json_loads(content)
             except json.JSONDecodeError as e:
                 logger.warning(
                     "Failed to parse JSON use start pattern: %s, %s", content, e
@@ -59,54 +142,118 @@ def extract_json(plan_response: str) -> str:
     if not content:
         raise ValueError("Empty content")
 
-    # Determine JSON type by first character and extract accordingly
-    if content.startswith("{"):
-        json_str = find_first_json_object(content)
-    elif content.startswith("["):
-        json_str = find_first_json_array(content)
-    else:
+    if not content.startswith(("{", "[")):
         raise ValueError("Content must start with '{' or '['")
 
-    if json_str:
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            logger.warning(
-                "Failed to parse JSON use content pattern: %s, %s", content, e
-            )
-
-    raise ValueError("No valid JSON content found in the response.")
+    # Decode the value opening the content in a single pass. Trailing text is
+    # ignored, but a malformed value is never replaced by one nested in it.
+    try:
+        parsed, _ = _JSON_DECODER.raw_decode(content)
+    except json.JSONDecodeError as e:
+        logger.warning("Failed to parse JSON use content pattern: %s, %s", content, e)
+        raise ValueError("No valid JSON content found in the response.")
+    return parsed
 
 
 def find_first_json_array(text: str) -> Optional[str]:
     """Find the first JSON array in the given text."""
-    stack = []
-    start = -1
-    for i, char in enumerate(text):
-        if char == "[":
-            if not stack:
-                start = i
-            stack.append(i)
-        elif char == "]":
-            if stack:
-                stack.pop()
-                if not stack:
-                    return text[start : i + 1]
-    return None
+    _, span = _find_first_json_array_decoded(text)
+    return text[span] if span else None
 
 
 def find_first_json_object(text: str) -> Optional[str]:
     """Find the first JSON object in the given text."""
-    stack = []
-    start = -1
-    for i, char in enumerate(text):
-        if char == "{":
-            if not stack:
-                start = i
-            stack.append(i)
-        elif char == "}":
-            if stack:
-                stack.pop()
-                if not stack:
-                    return text[start : i + 1]
-    return None
+    _, span = _find_first_json_object_decoded(text)
+    return text[span] if span else None
+
+
+def parse_first_json_object(text: str) -> Optional[dict]:
+    """Decode the first JSON object in the given text.
+
+    Responses that are exactly one JSON object (the common case for LLMs
+    asked for JSON) are decoded directly with json_loads; anything else falls
+    back to scanning for the first decodable object. Returns None if there
+    is no JSON object in the text.
+    """
+    content = text.strip()
+    if content.startswith("{") and content.endswith("}"):
+        try:
+            parsed = json_loads(content)
+            if isinstance(parsed, dict):
+                return parsed
+        except ValueError:
+            pass
+    parsed, _ = _find_first_json_object_decoded(text)
+    return parsed
+
+
+def _find_first_json_array_decoded(text: str) -> Tuple[Optional[list], Optional[slice]]:
+    """Decode the first JSON array in the given text.
+
+    Returns the decoded list together with its slice in `text`.
+    """
+    return _find_first_json_decoded(text, "[", list)
+
+
+def _find_first_json_object_decoded(
+    text: str,
+) -> Tuple[Optional[dict], Optional[slice]]:
+    """Decode the first JSON object in the given text.
+
+    Returns the decoded dict together with its slice in `text`.
+    """
+    return _find_first_json_decoded(text, "{", dict)
+
+
+def _find_first_json_decoded(
+    text: str, opener: str, kind: type
+) -> Tuple[Optional[Any], Optional[slice]]:
+    """Decode the first top-level value at `opener` that decodes to `kind`.
+
+    Candidate positions are located with `str.find` and each candidate is
+    handed to the C decoder via `raw_decode`, so the matched JSON is parsed
+    exactly once. A candidate that fails to decode is skipped as a whole:
+    values nested inside it are never returned in its place.
+    """
+    start = text.find(opener)
+    while start != -1:
+        try:
+            obj, end = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(obj, kind):
+                return obj, slice(start, end)
+        except json.JSONDecodeError:
+            end = _balanced_span_end(text, start)
+            if end == -1:
+                break
+        start = text.find(opener, end)
+    return None, None
+
+
+def _balanced_span_end(text: str, start: int) -> int:
+    """Index just past the bracket closing the one at `start`, or -1.
+
+    Only brackets of the kind at `start` are counted, and those inside
+    double-quoted strings are ignored.
+    """
+    opener = text[start]
+    closer = "]" if opener == "[" else "}"
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == opener:
+            depth += 1
+        elif char == closer:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
@@ -12,6 +12,9 @@ from app.storage.models import Namespace
 
 # Initialize Flask app
 app = Flask(__name__)
+# Responses keep their natural key order; sorting every jsonify payload only
+# costs time on large task listings.
+app.json.sort_keys = False
 app.register_blueprint(api_blueprint)
 app.register_blueprint(main_blueprint)
 
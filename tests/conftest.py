@@ -0,0 +1,5 @@
+import os
+
+# app.config.database builds its engine at import time; no connection is made
+# unless a test actually opens a session.
+os.environ.setdefault("DATABASE_URI", "mysql+pymysql://stackvm@127.0.0.1:3306/stackvm")
@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+
+from app.storage.branch_manager.git import GitManager, _ByteBoundedLRU
+
+
+def test_list_branches_with_unicode_line_separator_in_subject(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    gm.update_state({"a": 1})
+    # json_dumps keeps U+2028 and U+0085 unescaped in the commit message.
+    gm.commit_changes({"type": "x", "description": "line\u2028sep\x85end"})
+    gm.checkout_branch_from_commit("feature")
+
+    branches = gm.list_branches()
+
+    assert sorted(b["name"] for b in branches) == ["feature", "master"]
+    for branch in branches:
+        assert "line\u2028sep\x85end" in branch["last_commit_message"]
+
+
+def test_update_state_keeps_file_mode(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    state_file = tmp_path / "repo" / "vm_state.json"
+    state_file.chmod(0o644)
+
+    gm.update_state({"a": 1})
+
+    assert state_file.stat().st_mode & 0o777 == 0o644
+    assert gm.load_state(gm.commit_changes({"type": "x"})) == {"a": 1}
+
+
+def test_byte_bounded_lru_evicts_by_size():
+    blob = b"x" * 1000
+    cache = _ByteBoundedLRU(2 * sys.getsizeof(blob))
+    cache.put(("r", "a"), blob)
+    cache.put(("r", "b"), blob)
+    assert cache.get(("r", "a")) == blob
+
+    cache.put(("r", "c"), blob)
+    cache.put(("r", "huge"), blob * 3)
+
+    assert cache.get(("r", "b")) is None
+    assert cache.get(("r", "a")) == blob
+    assert cache.get(("r", "c")) == blob
+    assert cache.get(("r", "huge")) is None
+
+
+def test_byte_bounded_lru_uses_explicit_size():
+    cache = _ByteBoundedLRU(1000)
+    rows = (("sha", 0, "m" * 5000),)
+    cache.put(("r", "a"), rows, 6000)
+    cache.put(("r", "b"), rows, 500)
+
+    assert cache.get(("r", "a")) is None
+    assert cache.get(("r", "b")) == rows
+
+
+def test_list_branches_sees_created_branch(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    gm.update_state({"a": 1})
+    gm.commit_changes({"type": "x"})
+    assert [b["name"] for b in gm.list_branches()] == ["master"]
+
+    gm.checkout_branch_from_commit("feature")
+
+    assert sorted(b["name"] for b in gm.list_branches()) == ["feature", "master"]
+
+
+def test_list_branches_sees_ref_updates_from_other_processes(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    gm.update_state({"a": 1})
+    first = gm.commit_changes({"type": "x"})
+    gm.update_state({"a": 2})
+    second = gm.commit_changes({"type": "x"})
+    gm.checkout_branch_from_commit("feature", first)
+    heads = {b["name"]: b["last_commit_hash"] for b in gm.list_branches()}
+    assert heads["feature"] == first
+
+    # Another worker moves the ref within the same mtime tick.
+    heads_dir = tmp_path / "repo" / ".git" / "refs" / "heads"
+    ref_file = heads_dir / "feature"
+    times = {
+        p: (p.stat().st_atime_ns, p.stat().st_mtime_ns) for p in (heads_dir, ref_file)
+    }
+    subprocess.run(
+        [
+            "git",
+            "-C",
+            str(tmp_path / "repo"),
+            "update-ref",
+            "refs/heads/feature",
+            second,
+        ],
+        check=True,
+    )
+    for path, ns in times.items():
+        os.utime(path, ns=ns)
+
+    heads = {b["name"]: b["last_commit_hash"] for b in gm.list_branches()}
+    assert heads["feature"] == second
+
+
+def test_get_state_diff_of_merge_commit_uses_first_parent(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    gm.update_state({"a": 1})
+    base = gm.commit_changes({"type": "x"})
+    gm.checkout_branch_from_commit("feature", base)
+    gm.update_state({"a": 1, "b": 2})
+    gm.commit_changes({"type": "x"})
+    gm.checkout_branch("master")
+    gm.repo.git.merge("feature", "--no-ff", "--no-edit")
+    merge = gm.get_current_commit_hash()
+
+    diff = gm.get_state_diff(merge)
+
+    assert '+  "b": 2' in diff
+    assert gm.get_state_diff(base).startswith("diff --git")
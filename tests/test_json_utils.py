@@ -0,0 +1,86 @@
+from datetime import datetime
+import math
+
+import pytest
+
+from app.core.plan.utils import parse_plan
+from app.utils import (
+    extract_json,
+    find_first_json_array,
+    find_first_json_object,
+    json_dumps,
+    json_loads,
+    parse_first_json_object,
+)
+
+
+def test_parse_first_json_object_embedded_in_text():
+    assert parse_first_json_object('answer: {"a": 1} done') == {"a": 1}
+
+
+def test_parse_first_json_object_rejects_nested_value_of_malformed_outer():
+    assert parse_first_json_object('{"result": tru, "explanation": {"k": 1}}') is None
+
+
+def test_parse_first_json_object_skips_malformed_candidate():
+    text = 'first {"a": tru, "b": {"c": 1}} then {"d": 2}'
+    assert parse_first_json_object(text) == {"d": 2}
+
+
+def test_parse_first_json_object_ignores_brackets_inside_strings():
+    text = '{"a": "}", "b": tru} {"c": 3}'
+    assert parse_first_json_object(text) == {"c": 3}
+
+
+def test_find_first_json_helpers_return_top_level_span():
+    assert find_first_json_object('x {"a": {"b": 1}} y') == '{"a": {"b": 1}}'
+    assert find_first_json_array("x [[1], 2,] y") is None
+
+
+def test_parse_plan_rejects_trailing_comma_plan():
+    response = '[{"seq_no": 0, "type": "assign", "parameters": {"x": ["a", "b"]}},]'
+    with pytest.raises(ValueError):
+        parse_plan(response)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"result": tru, "explanation": {"k": 1}}',
+        '[{"a": 1},] [2]',
+        '{"a": tru} {"b": 2}',
+    ],
+)
+def test_extract_json_rejects_malformed_outer_value(content):
+    with pytest.raises(ValueError, match="No valid JSON content found"):
+        extract_json(content)
+
+
+def test_extract_json_ignores_trailing_text():
+    assert extract_json('[1, {"a": 2}] trailing') == [1, {"a": 2}]
+
+
+@pytest.mark.parametrize("indent", [False, True])
+def test_json_round_trip_keeps_wide_ints(indent):
+    assert json_loads(json_dumps({"x": 2**70, "y": -(2**64)}, indent=indent)) == {
+        "x": 2**70,
+        "y": -(2**64),
+    }
+
+
+def test_json_round_trip_keeps_nan_and_infinity():
+    decoded = json_loads(json_dumps({"nan": float("nan"), "inf": float("inf")}))
+    assert math.isnan(decoded["nan"])
+    assert decoded["inf"] == float("inf")
+
+
+def test_json_loads_reads_stdlib_nan_documents():
+    decoded = json_loads(b'{"a": NaN, "b": -Infinity, "c": null}')
+    assert math.isnan(decoded["a"])
+    assert decoded["b"] == float("-inf")
+    assert decoded["c"] is None
+
+
+def test_json_dumps_renders_datetimes_with_str():
+    value = datetime(2024, 1, 1, 12, 0, 0)
+    assert json_loads(json_dumps({"at": value})) == {"at": "2024-01-01 12:00:00"}
@@ -0,0 +1,45 @@
+from app.core.plan.evaluator import evaluate_execution_error
+from app.core.vm.engine import PlanExecutionVM
+from app.llm.interface import LLMInterface
+from app.storage.branch_manager.git import GitManager
+
+
+class ScriptedProvider:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def generate(self, prompt, context=None, **kwargs):
+        return self.responses.pop(0)
+
+
+def _cached_llm(responses):
+    llm = LLMInterface("ollama", "test-model")
+    llm.provider = ScriptedProvider(responses)
+    llm.response_cache_size = 8
+    return llm
+
+
+def test_generate_replays_cached_response():
+    llm = _cached_llm(["first", "second"])
+    assert llm.generate("prompt") == "first"
+    assert llm.generate("prompt") == "first"
+
+
+def test_jmp_retry_does_not_replay_unparseable_response(tmp_path):
+    llm = _cached_llm(["not json", '{"result": true, "explanation": "ok"}'])
+    vm = PlanExecutionVM("goal", GitManager(str(tmp_path / "repo")), llm)
+    params = {"condition_prompt": "Is it?", "jump_if_true": 3, "jump_if_false": 4}
+
+    success, error = vm.instruction_handlers.jmp_handler(params)
+    assert not success
+    assert error["error_message"].startswith("Failed to parse JSON response")
+
+    assert vm.instruction_handlers.jmp_handler(params) == (True, {"target_seq": 3})
+
+
+def test_evaluator_retry_does_not_replay_unparseable_response():
+    llm = _cached_llm(["not json", '{"root_cause": "x"}'])
+    args = (llm, "goal", ["step"], "boom", 0)
+
+    assert evaluate_execution_error(*args) is None
+    assert evaluate_execution_error(*args) == {"root_cause": "x"}
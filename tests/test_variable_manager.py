@@ -0,0 +1,39 @@
+from app.core.vm.variable_manager import VariableManager
+
+
+def make_manager(**variables):
+    vm = VariableManager()
+    for name, value in variables.items():
+        vm.set(name, value)
+    return vm
+
+
+def test_interpolate_simple_and_structured_references():
+    vm = make_manager(name="stack", info={"kind": "vm", "size": 3})
+    text = "${name}: ${info.kind} x${info.size} ${info.missing} ${unknown}"
+    assert vm.interpolate_variables(text) == "stack: vm x3 ${info.missing} ${unknown}"
+
+
+def test_interpolate_resolves_reference_inside_substituted_value():
+    vm = make_manager(a="${b}", b="B")
+    assert vm.interpolate_variables("${a}") == "B"
+
+
+def test_interpolate_keeps_insertion_order_for_chained_references():
+    # Variables earlier in insertion order are not re-applied to text
+    # substituted by later ones.
+    vm = make_manager(b="B", a="${b}")
+    assert vm.interpolate_variables("${a}") == "${b}"
+
+
+def test_interpolate_reflects_in_place_mutation():
+    items = [1]
+    vm = make_manager(items=items)
+    assert vm.interpolate_variables("${items}") == "[1]"
+    generation = vm.generation()
+
+    vm.get("items").append(2)
+
+    # In-place changes do not bump the generation, but the text is fresh.
+    assert vm.generation() == generation
+    assert vm.interpolate_variables("${items}") == "[1, 2]"
@@ -0,0 +1,45 @@
+import json
+
+from app.core.vm.engine import PlanExecutionVM
+from app.storage.branch_manager.git import GitManager
+
+PLAN = [
+    {"seq_no": 0, "type": "assign", "parameters": {"x": "1"}},
+    {"seq_no": 1, "type": "assign", "parameters": {"y": "2"}},
+    {"seq_no": 2, "type": "assign", "parameters": {"final_answer": "${x} ${y}"}},
+]
+
+
+def _step_commits(gm):
+    messages = [c["message"] for c in gm.get_commits(gm.get_current_branch())]
+    return [json.loads(m) for m in reversed(messages) if "StepExecution" in m]
+
+
+def test_batched_steps_share_one_commit(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    vm = PlanExecutionVM("goal", gm, None, commit_batch_size=2)
+    vm.set_plan("reasoning", PLAN)
+
+    results = [vm.step() for _ in PLAN]
+
+    assert [r["commit_hash"] is not None for r in results] == [False, True, True]
+    batch, last = _step_commits(gm)
+    assert batch["seq_no"] == 1
+    assert [step["seq_no"] for step in batch["steps"]] == [0, 1]
+    assert batch["output_variables"] == {"x": "1", "y": "2"}
+    assert "steps" not in last
+    assert gm.load_state(results[1]["commit_hash"])["program_counter"] == 2
+
+
+def test_set_plan_commits_steps_of_the_old_plan(tmp_path):
+    gm = GitManager(str(tmp_path / "repo"))
+    vm = PlanExecutionVM("goal", gm, None, commit_batch_size=0)
+    vm.set_plan("reasoning", PLAN)
+    vm.step()
+    assert _step_commits(gm) == []
+
+    vm.set_plan("updated", PLAN)
+
+    (commit,) = _step_commits(gm)
+    assert commit["seq_no"] == 0
+    assert "steps" not in commit